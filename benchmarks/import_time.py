@@ -0,0 +1,78 @@
+"""Measures the cold import time of the events_library, and checks
+which heavy dependencies are loaded just by importing it.
+
+Usage (with the settings of a project that installs the lib):
+
+    DJANGO_SETTINGS_MODULE=project.settings python benchmarks/import_time.py
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Dependencies that should only be loaded when they are used
+HEAVY_MODULES = [
+    'requests',
+    'rest_framework.serializers',
+    'rest_framework.views',
+    'jwt_auth',
+    'enumfields',
+]
+
+MEASURE_SCRIPT = '''
+import json, sys, time
+import django
+django.setup()
+
+preloaded = set(sys.modules)
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+
+print(json.dumps({{
+    'elapsed': elapsed,
+    'loaded': [
+        name for name in {heavy_modules!r}
+        if name in sys.modules and name not in preloaded
+    ],
+}}))
+'''
+
+
+def measure(module: str) -> dict:
+    """Imports the module in a new interpreter (after setting up
+    Django, which every process pays anyway) and returns the time
+    it took, and the heavy dependencies that it loaded (the ones
+    already loaded by django.setup are not reported)"""
+    script = MEASURE_SCRIPT.format(
+        module=module, heavy_modules=HEAVY_MODULES,
+    )
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--module', default='events_library.utils',
+        help='The module to import (default: events_library.utils)',
+    )
+    parser.add_argument(
+        '--runs', type=int, default=10,
+        help='Amount of cold imports measured (default: 10)',
+    )
+    args = parser.parse_args()
+
+    results = [measure(args.module) for _ in range(args.runs)]
+    timings = [result['elapsed'] * 1000 for result in results]
+
+    print(f'import {args.module} ({args.runs} runs)')
+    print(f'  median: {statistics.median(timings):.1f} ms')
+    print(f'  min:    {min(timings):.1f} ms')
+    print(f'  max:    {max(timings):.1f} ms')
+    print(f'  heavy modules loaded: {results[-1]["loaded"] or "none"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+from .lazy_exports import make_lazy_getattr
+
+# The public API is loaded on first use, so that
+# importing the lib is fast in short-lived processes
+__getattr__ = make_lazy_getattr(globals(), {
+    'emit': '.utils',
+    'subscribe_to': '.utils',
+    'subscribe_to_cud': '.utils',
+    'declare_event': '.utils',
+    'declare_cud_event': '.utils',
+    'Service': '.utils',
+    'CudEvent': '.utils',
+    'EventPriority': '.utils',
+    'CudManager': '.utils',
+})
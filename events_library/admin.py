@@ -4,7 +4,7 @@ from django.contrib import admin
 from django.db.models import Model
 from django.http.request import HttpRequest
 
-from .domain import EventLog, HandlerLog
+from .domain import EventLog, EventProfile, HandlerLog
 
 
 class InmutableAdminModel(admin.ModelAdmin):
@@ -12,6 +12,9 @@ class InmutableAdminModel(admin.ModelAdmin):
     Add and Edit functionalities of the model,
     although it still allows the deletion"""
 
+    # Counting every row of the big log tables is slow
+    show_full_result_count = False
+
     def has_add_permission(self, request: HttpRequest) -> bool:
         """Disables Add"""
         return False
@@ -38,6 +41,8 @@ class EventLogAdmin(InmutableAdminModel):
         'was_success', 'created_at',
     ]
     ordering = ["-created_at"]
+    exclude = ["payload", "payload_ref"]
+    readonly_fields = ["stored_payload"]
 
 
 @admin.register(HandlerLog)
@@ -49,3 +54,19 @@ class HandlerLogAdmin(InmutableAdminModel):
         'handler_name', 'created_at',
     ]
     ordering = ["-created_at"]
+    exclude = ["payload", "payload_ref"]
+    readonly_fields = ["stored_payload"]
+
+
+@admin.register(EventProfile)
+class EventProfileAdmin(InmutableAdminModel):
+    list_filter = ["target_service"]
+    search_fields = ["event_type"]
+
+    list_display = [
+        'event_type', 'target_service',
+        'estimated_count', 'average_payload_bytes',
+        'average_compressed_bytes', 'average_serialization_ms',
+        'p50_latency_ms', 'p99_latency_ms', 'updated_at',
+    ]
+    ordering = ["-estimated_count"]
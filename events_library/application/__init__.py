@@ -1,3 +1,12 @@
-from .permissions import ServiceTokenPermission  # noqa: F401
-from .serializers import EventSerializer, CudPayloadSerializer  # noqa: F401
-from .views import EventViewSet  # noqa: F401
+from ..lazy_exports import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(globals(), {
+    'ServiceTokenPermission': '.permissions',
+    'EventSerializer': '.serializers',
+    'CudPayloadSerializer': '.serializers',
+    'CudBatchPayloadSerializer': '.serializers',
+    'EventViewSet': '.views',
+    'emit_received_event': '.event_handling',
+    'enqueue_received_event': '.event_handling',
+    'handle_received_event': '.event_handling',
+})
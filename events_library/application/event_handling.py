@@ -0,0 +1,65 @@
+"""Functions for handling the events received from other services"""
+import typing
+
+from django.conf import settings
+
+from .serializers import CudPayloadSerializer, CudBatchPayloadSerializer
+from ..core import EventBus, EventDeduplicator, EventQueue
+
+
+def emit_received_event(event_type: str, payload: typing.Dict):
+    """Calls the handlers (or applies the CUD changes)
+    of the event, in the current process"""
+    # Check if the incoming event is of kind CUD
+    payload_serializer = CudPayloadSerializer(data=payload)
+    batch_payload_serializer = CudBatchPayloadSerializer(data=payload)
+    if payload_serializer.is_valid():
+        EventBus.emit_cud_locally(event_type, payload)
+    elif batch_payload_serializer.is_valid():
+        EventBus.emit_cud_batch_locally(event_type, payload)
+    else:
+        EventBus.emit_locally(event_type, payload)
+
+
+def enqueue_received_event(event_type: str, payload: typing.Dict):
+    """Stores the event in the EventQueue, to be handled by the
+    consume_events command. Batched CUD events are split, so that
+    each object is queued in the partition of its own id"""
+    batch_payload_serializer = CudBatchPayloadSerializer(data=payload)
+    if batch_payload_serializer.is_valid():
+        for cud_object in payload['objects']:
+            EventQueue.enqueue(event_type, {
+                'id': cud_object['id'],
+                'cud_operation': payload['cud_operation'],
+                'data': cud_object['data'],
+                'timestamp': payload['timestamp'],
+            }, partition_key=cud_object['id'])
+        return
+
+    partition_key = None
+    if isinstance(payload, dict):
+        partition_key = payload.get('id', None)
+
+    EventQueue.enqueue(event_type, payload, partition_key)
+
+
+def handle_received_event(
+    event_id: typing.Optional[str],
+    event_type: str,
+    payload: typing.Dict,
+):
+    """Handles an event received from another service, discarding it
+    if it was already received. When the QUEUE_RECEIVED_EVENTS setting
+    is True, the event is queued instead of being handled right away"""
+    if getattr(settings, 'QUEUE_RECEIVED_EVENTS', False):
+        def handle_event():
+            enqueue_received_event(event_type, payload)
+    else:
+        def handle_event():
+            emit_received_event(event_type, payload)
+
+    if event_id is None:
+        # Sent by an old version of the lib, that doesn't stamp ids
+        handle_event()
+    else:
+        EventDeduplicator.handle_once(event_id, handle_event)
@@ -5,6 +5,7 @@ from ..core.event_bus import CudEvent
 
 class EventSerializer(serializers.Serializer):
     """Serializer for validating payloads in any event"""
+    event_id = serializers.UUIDField(required=False)
     event_type = serializers.CharField()
     payload = serializers.JSONField()
 
@@ -33,3 +34,27 @@ class CudPayloadSerializer(serializers.Serializer):
                 'cud_operation: 'f'{value} is not a valid value'
             })
         return value
+
+
+class CudObjectSerializer(serializers.Serializer):
+    """Serializer for validating each object in batched CUD events"""
+    id = serializers.UUIDField()
+    data = serializers.JSONField()
+
+
+class CudBatchPayloadSerializer(serializers.Serializer):
+    """Serializer for validating payloads in batched CUD events,
+    emitted for bulk operations. The result of validating some
+    data is a dict with:
+        cud_operation: str('created' | 'updated' | 'deleted')
+        objects: list of dict(id: str (uuid), data: dict)
+        timestamp: float
+    """
+    cud_operation = serializers.CharField()
+    objects = CudObjectSerializer(many=True)
+    timestamp = serializers.FloatField()
+
+    class Meta:
+        fields = '__all__'
+
+    validate_cud_operation = CudPayloadSerializer.validate_cud_operation
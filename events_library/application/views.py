@@ -7,10 +7,8 @@ from rest_framework.status import HTTP_204_NO_CONTENT
 from jwt_auth.authentication import ServiceTokenAuthentication
 
 from .permissions import ServiceTokenPermission
-from .serializers import (
-    EventSerializer, CudPayloadSerializer,
-)
-from ..core import EventBus
+from .event_handling import handle_received_event
+from .serializers import EventSerializer
 
 
 class EventViewSet(ViewSet):
@@ -23,14 +21,10 @@ class EventViewSet(ViewSet):
         event_serializer = EventSerializer(data=request.data)
         event_serializer.is_valid(raise_exception=True)
 
+        event_id = event_serializer.validated_data.get('event_id', None)
         event_type = event_serializer.validated_data['event_type']
         payload = event_serializer.validated_data['payload']
 
-        # Check if the incoming event is of kind CUD
-        payload_serializer = CudPayloadSerializer(data=payload)
-        if payload_serializer.is_valid():
-            EventBus.emit_cud_locally(event_type, payload)
-        else:
-            EventBus.emit_locally(event_type, payload)
+        handle_received_event(event_id, event_type, payload)
 
         return Response(status=HTTP_204_NO_CONTENT)
@@ -1,2 +1,17 @@
-from .event_api import EventApi  # noqa: F401
-from .event_bus import EventBus, CudEvent  # noqa: F401
+from ..lazy_exports import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(globals(), {
+    'EventApi': '.event_api',
+    'EventLanes': '.event_lane',
+    'EventPriority': '.event_lane',
+    'ReplicaCache': '.replica_cache',
+    'EventDeduplicator': '.event_deduplicator',
+    'EventQueue': '.event_queue',
+    'EventProfiler': '.event_profiler',
+    'PayloadStore': '.payload_store',
+    'EventBus': '.event_bus',
+    'CudEvent': '.event_bus',
+    'CudManager': '.cud_queryset',
+    'CudQuerySet': '.cud_queryset',
+    'CudQuerySetMixin': '.cud_queryset',
+})
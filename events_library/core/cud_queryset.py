@@ -0,0 +1,183 @@
+"""CudQuerySet class, used for emitting CUD events on bulk operations"""
+import typing
+
+from django.db import models, transaction
+
+from .event_bus import CudEvent, EventBus
+
+
+def iterate_pk_chunks(
+    queryset: models.QuerySet,
+    chunk_size: int,
+) -> typing.Iterator[typing.List]:
+    """Yields the primary keys of the rows in the queryset, in chunks
+    of at most chunk_size, using keyset pagination (instead of OFFSET)
+    so that every chunk is read in the same amount of time"""
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = queryset.filter(pk__gt=last_pk)
+
+        pks = list(chunk_queryset[:chunk_size])
+        if not pks:
+            return
+
+        yield pks
+        last_pk = pks[-1]
+
+
+class CudQuerySetMixin():
+    """QuerySet mixin for models declared with declare_cud_event,
+    which emits batched CUD events for each bulk operation (update,
+    delete, bulk_create and bulk_update), that otherwise would
+    emit nothing, or one event for each deleted row"""
+
+    # Max amount of rows read from the DB at once
+    cud_chunk_size = 1000
+
+    # Max amount of objects sent in each batched CUD event
+    cud_max_batch_objects = 1000
+
+    def is_cud_declared(self) -> bool:
+        return self.model in EventBus.map_model_class_to_cud_resource
+
+    def emit_cud_batch(
+        self,
+        cud_operation: str,
+        instances_chunks: typing.Iterable[typing.List[models.Model]],
+    ):
+        EventBus.emit_cud_batch(
+            self.model, cud_operation, instances_chunks,
+            self.cud_max_batch_objects,
+        )
+
+    def split_chunks(
+        self,
+        objs: typing.List[models.Model],
+    ) -> typing.Iterator[typing.List[models.Model]]:
+        for index in range(0, len(objs), self.cud_chunk_size):
+            yield objs[index:index + self.cud_chunk_size]
+
+    def read_chunks(
+        self,
+        pks: typing.Iterable,
+    ) -> typing.Iterator[typing.List[models.Model]]:
+        """Yields the rows with the given pks, as they are stored in the
+        DB (not as the in-memory objs), in chunks ordered by the pk"""
+        base_queryset = self.model._base_manager.using(self.db)
+        pks = sorted(set(pks))
+
+        for index in range(0, len(pks), self.cud_chunk_size):
+            chunk_pks = pks[index:index + self.cud_chunk_size]
+            yield list(
+                base_queryset.filter(pk__in=chunk_pks).order_by('pk'),
+            )
+
+    def update(self, **kwargs) -> int:
+        # A sliced queryset can't be filtered (nor updated)
+        if not self.is_cud_declared() or not self.query.can_filter():
+            return super().update(**kwargs)
+
+        base_queryset = self.model._base_manager.using(self.db)
+        rows = 0
+
+        def update_chunks():
+            nonlocal rows
+            for pks in iterate_pk_chunks(self, self.cud_chunk_size):
+                chunk_queryset = base_queryset.filter(pk__in=pks)
+                rows += models.QuerySet.update(chunk_queryset, **kwargs)
+                yield list(chunk_queryset.order_by('pk'))
+
+        with transaction.atomic(using=self.db):
+            self.emit_cud_batch(CudEvent.UPDATED, update_chunks())
+
+        return rows
+
+    def delete(self) -> typing.Tuple[int, typing.Dict[str, int]]:
+        # A sliced queryset can't be filtered (nor deleted)
+        if not self.is_cud_declared() or not self.query.can_filter():
+            return super().delete()
+
+        base_queryset = self.model._base_manager.using(self.db)
+        deleted, rows_count = 0, {}
+
+        def delete_chunks():
+            nonlocal deleted
+            for pks in iterate_pk_chunks(self, self.cud_chunk_size):
+                chunk_queryset = base_queryset.filter(pk__in=pks)
+
+                # The instances are serialized before deleting them
+                yield list(chunk_queryset.order_by('pk'))
+
+                # Only the rows of the chunk are in the batch, so the
+                # ones deleted by a cascade (self-referential foreign
+                # keys) still send their own event
+                with EventBus.bulk_deleting(self.model, pks):
+                    chunk_deleted, chunk_rows_count = (
+                        models.QuerySet.delete(chunk_queryset)
+                    )
+                deleted += chunk_deleted
+                for label, count in chunk_rows_count.items():
+                    rows_count[label] = rows_count.get(label, 0) + count
+
+        with transaction.atomic(using=self.db):
+            self.emit_cud_batch(CudEvent.DELETED, delete_chunks())
+
+        return deleted, rows_count
+
+    def bulk_create(
+        self,
+        objs,
+        batch_size: int = None,
+        ignore_conflicts: bool = False,
+    ) -> typing.List[models.Model]:
+        if not self.is_cud_declared():
+            return super().bulk_create(objs, batch_size, ignore_conflicts)
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, batch_size, ignore_conflicts)
+
+            # Without RETURNING support the pk of the objs is unknown
+            created = [obj for obj in objs if obj.pk is not None]
+
+            if ignore_conflicts:
+                # The pks are set before the insert (UUIDs), so the objs
+                # that conflicted are listed too, and only the pks that
+                # exist are sent (with the stored rows, if they existed)
+                self.emit_cud_batch(
+                    CudEvent.CREATED,
+                    self.read_chunks(obj.pk for obj in created),
+                )
+            else:
+                self.emit_cud_batch(
+                    CudEvent.CREATED, self.split_chunks(created),
+                )
+
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        if not self.is_cud_declared():
+            return super().bulk_update(objs, *args, **kwargs)
+
+        objs = list(objs)
+
+        # Only the given fields are written, so the rows are read back,
+        # as the objs might have other fields changed but not saved
+        with transaction.atomic(using=self.db):
+            result = super().bulk_update(objs, *args, **kwargs)
+            self.emit_cud_batch(
+                CudEvent.UPDATED,
+                self.read_chunks(obj.pk for obj in objs),
+            )
+
+        return result
+
+
+class CudQuerySet(CudQuerySetMixin, models.QuerySet):
+    """QuerySet that emits CUD events on bulk operations"""
+
+
+CudManager = models.Manager.from_queryset(CudQuerySet)
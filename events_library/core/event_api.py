@@ -1,19 +1,30 @@
 """EventApi class, used for emitting events"""
+import logging
+import time
 import typing
+import zlib
+from uuid import uuid4
 
 from django.conf import settings
 from requests import Request, RequestException, Session
 from rest_framework.renderers import JSONRenderer
 
+from .event_profiler import EventProfiler, EventSample
+from .payload_store import PayloadStore
 from ..domain import EventLog
 
-LOG_EVENTS_ON_SUCCESS = settings.LOG_EVENTS_ON_SUCCESS
+logger = logging.getLogger(__name__)
 
 
 class EventApi:
     """Class for making HTTP request related to events"""
 
-    def __init__(self, domain: str = None, max_retries: int = None) -> None:
+    def __init__(
+        self,
+        domain: str = None,
+        max_retries: int = None,
+        timeout: float = None,
+    ) -> None:
         """Initialize requests session."""
         self.session = Session()
         self.session.headers.update({
@@ -22,11 +33,14 @@ class EventApi:
 
         self.domain = domain or settings.DOMAIN_NAME
         self.max_retries = max_retries or 1
+        self.timeout = timeout or getattr(
+            settings, 'EVENT_REQUEST_TIMEOUT', 10,
+        )
 
     def send_request(
         self,
         url: str,
-        data: typing.Dict,
+        data: typing.Union[typing.Dict, bytes],
         raise_exception: bool = True,
     ):
         """Sends a request to the specified url
@@ -34,23 +48,26 @@ class EventApi:
         Arguments:
             url: str
                 The url of the endpoint
-            data: dict
-                The data sent in the request
+            data: dict | bytes
+                The data sent in the request (or its JSON encoding)
             raise_exception: bool
                 Wheter to raise an exception when an
                 HTTPError is found while doing the request
         """
+        if not isinstance(data, bytes):
+            data = JSONRenderer().render(data)
+
         req = Request(
             method='POST',
             url=f'https://{self.domain}/{url}',
-            data=JSONRenderer().render(data),
+            data=data,
             headers={
                 'Token': settings.JWT_AUTH['SERVICE_SECRET_TOKEN'],
             },
         )
 
         prepared_req = self.session.prepare_request(req)
-        resp = self.session.send(prepared_req)
+        resp = self.session.send(prepared_req, timeout=self.timeout)
 
         if raise_exception:
             resp.raise_for_status()
@@ -60,6 +77,8 @@ class EventApi:
         service_name: str,
         event_type: str,
         payload: typing.Dict,
+        event_id: str = None,
+        sample: EventSample = None,
     ):
         """Sends event to the provided service_name. It also uses
         some retry logic inside of it, and logs the event in DB
@@ -71,16 +90,39 @@ class EventApi:
                 The type of event being sent
             payload: dict
                 The payload data sent along the event
+            event_id: str
+                The unique id of the event, which is the same in every
+                retry, so that the receiver can discard duplicates
+            sample: EventSample
+                When provided, the event is measured, and
+                recorded in the EventProfiler once it's sent
         """
 
         retry_number = 0
         path = f'service/{service_name}/event/'
-        event = {'event_type': event_type, 'payload': payload}
+        event = {
+            'event_id': event_id or str(uuid4()),
+            'event_type': event_type,
+            'payload': payload,
+        }
+
+        if sample is not None:
+            started_at = time.perf_counter()
+            event = JSONRenderer().render(event)
+            sample.serialization_time += time.perf_counter() - started_at
+            sample.payload_bytes = len(event)
+            sample.compressed_bytes = len(zlib.compress(event))
+
+        # Stored once, for the logs of every retry
+        log_fields = None
 
         while (retry_number < self.max_retries):
             was_success = True
             error_message = ''
 
+            # Only the requests are timed, not the logs
+            started_at = time.perf_counter()
+
             try:
                 self.send_request(path, event)
 
@@ -90,11 +132,17 @@ class EventApi:
                 error_message = str(error)
 
             finally:
-                if LOG_EVENTS_ON_SUCCESS or not was_success:
+                if sample is not None:
+                    sample.latency += time.perf_counter() - started_at
+
+                if settings.LOG_EVENTS_ON_SUCCESS or not was_success:
+                    if log_fields is None:
+                        log_fields = PayloadStore.get_log_fields(payload)
+
                     EventLog.objects.create(
                         target_service=service_name,
                         event_type=event_type,
-                        payload=payload,
+                        **log_fields,
                         retry_number=retry_number,
                         was_success=was_success,
                         error_message=error_message,
@@ -102,3 +150,10 @@ class EventApi:
 
                 if was_success:
                     break
+
+        if sample is not None:
+            # The profiler must never make the sending of an event fail
+            try:
+                EventProfiler.record(event_type, service_name, sample)
+            except Exception:
+                logger.exception('Could not record the event sample')
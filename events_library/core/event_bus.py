@@ -1,13 +1,22 @@
+import contextlib
+import hashlib
+import json
+import threading
 import time
 import typing
+from uuid import uuid4
 
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Model
-from django.db.models.signals import post_save, post_delete
-from enumfields.drf import EnumSupportSerializerMixin
-from rest_framework.serializers import ModelSerializer
-
-from ..core import EventApi
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save,
+)
+
+from .event_lane import EventLanes, EventPriority
+from .event_profiler import EventProfiler
+from .payload_store import PayloadStore
+from .replica_cache import ReplicaCache
 from ..domain import HandlerLog, ObjectModel
 
 
@@ -19,6 +28,24 @@ class CudEvent():
     DELETED = 'deleted'
 
 
+# Name of the instance attribute where the
+# snapshot of the field values is stored
+CHANGES_DIGEST_ATTRIBUTE = '_events_library_digest'
+
+
+def get_fields_digest(instance: Model, attnames: typing.List[str]) -> str:
+    """Returns a hash of the values of the given fields of the
+    instance. Deferred fields are skipped, so that calculating
+    the digest never triggers a query"""
+    values = {
+        attname: instance.__dict__[attname]
+        for attname in attnames
+        if attname in instance.__dict__
+    }
+    encoded = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.md5(encoded.encode()).hexdigest()
+
+
 class EventBus():
     """Main class of the lib, controlling the
     event's logic and subscription/emittion flow"""
@@ -31,12 +58,26 @@ class EventBus():
     # and the value is a list of service's names
     map_event_to_target_services = {}
 
+    # A mapping, where the key is an event_type,
+    # and the value is the priority (lane) used
+    # for sending the events of that event_type
+    map_event_to_priority = {}
+
     # A mapping, where the key is the name of a
     # resource ('users', 'articles', 'categories')
     # and the value is a Django Model class, that
     # must inherit from
     map_event_to_model_class = {}
 
+    # A mapping, where the key is a Django Model class
+    # declared with declare_cud_event, and the value
+    # is a tuple with its resource_name and serializer
+    map_model_class_to_cud_resource = {}
+
+    # Thread local state, holding the Model classes whose
+    # post_delete signals are handled by a bulk operation
+    local_state = threading.local()
+
     @classmethod
     def subscribe(cls, event_type: str, event_handler: typing.Callable):
         """Adds the event_handler to the list of functions to be
@@ -53,12 +94,17 @@ class EventBus():
         cls,
         resource_name: str,
         object_model_class: typing.Type[ObjectModel],
+        replica_cache: ReplicaCache = None,
     ):
         """Subscribes a Model class, identified by the given
         resource_name argument, to CUD changes in the service
-        which acts as source of true for the given Model"""
+        which acts as source of true for the given Model. The
+        replica_cache, if provided, is kept updated with them"""
         cls.map_event_to_model_class[resource_name] = object_model_class
 
+        if replica_cache is not None:
+            object_model_class.replica_cache = replica_cache
+
     @classmethod
     def emit_locally(cls, event_type: str, payload: typing.Dict):
         """Calls, with the given payload as argument, each
@@ -68,14 +114,23 @@ class EventBus():
         if event_type not in cls.map_event_to_handlers:
             return  # No op
 
+        # Stored once, for the logs of every handler
+        log_fields = None
+
         for event_handler in cls.map_event_to_handlers[event_type]:
             try:
-                event_handler(payload)
+                # A savepoint, so that a DB error in the handler doesn't
+                # break the transaction in which the event is handled
+                with transaction.atomic():
+                    event_handler(payload)
 
             except Exception as error:
+                if log_fields is None:
+                    log_fields = PayloadStore.get_log_fields(payload)
+
                 HandlerLog.objects.create(
                     event_type=event_type,
-                    payload=payload,
+                    **log_fields,
                     error_message=str(error),
                     handler_name=event_handler.__name__,
                 )
@@ -97,8 +152,18 @@ class EventBus():
         object_id = payload['id']
         cud_operation = payload.pop('cud_operation')
 
+        replica_cache: ReplicaCache = getattr(
+            model_class, 'replica_cache', None,
+        )
+
         if cud_operation == CudEvent.DELETED:
-            model_class.objects.filter(pk=object_id).delete()
+            # A replica updated by a newer event is not deleted
+            model_class.objects.filter(
+                pk=object_id, timestamp__lte=payload['timestamp'],
+            ).delete()
+
+            if replica_cache is not None:
+                replica_cache.discard(object_id)
         else:
             try:
                 model_instance: ObjectModel = model_class.objects.get(
@@ -107,34 +172,144 @@ class EventBus():
             except model_class.DoesNotExist:
                 model_instance: ObjectModel = model_class(pk=object_id)
 
+            # Events might arrive out of order, so an event older
+            # than the one applied to the replica is discarded
+            if (
+                model_instance.timestamp is not None
+                and payload['timestamp'] < model_instance.timestamp
+            ):
+                return  # No op
+
             # This is the way that DRF uses for updating models
             for attr, value in payload.items():
                 setattr(model_instance, attr, value)
 
             model_instance.save()
 
+            if replica_cache is not None:
+                replica_cache.refresh(model_instance)
+
+    @classmethod
+    def emit_cud_batch_locally(cls, resource_name: str, payload: typing.Dict):
+        """Performs, for each object in a batched CUD event, the
+        same CUD action as if it had been received as a single event"""
+        for cud_object in payload['objects']:
+            cls.emit_cud_locally(resource_name, {
+                'id': cud_object['id'],
+                'cud_operation': payload['cud_operation'],
+                'data': cud_object['data'],
+                'timestamp': payload['timestamp'],
+            })
+
     @classmethod
-    def emit_abroad(cls, event_type: str, payload: typing.Dict):
-        """Sends the event to the services that
-        are subscribed to the given event_type"""
+    def emit_cud_batch(
+        cls,
+        model_class: typing.Type[Model],
+        cud_operation: str,
+        instances_chunks: typing.Iterable[typing.List[Model]],
+        max_batch_objects: int = 1000,
+    ):
+        """Sends batched CUD events with every instance in the given
+        chunks, which must be of a model declared with declare_cud_event.
+        Each chunk is serialized as soon as it's yielded, and an event
+        is sent whenever max_batch_objects objects are serialized, so
+        that neither the memory nor the events grow with the operation"""
+        resource_name, serializer_class = (
+            cls.map_model_class_to_cud_resource[model_class]
+        )
+
+        cud_objects = []
+        serialization_time = 0
+
+        def emit_batch(batch_objects: typing.List[typing.Dict]):
+            cls.emit_abroad(resource_name, {
+                'cud_operation': cud_operation,
+                'objects': batch_objects,
+                'timestamp': time.time(),
+            }, serialization_time)
+
+        for instances in instances_chunks:
+            started_at = time.perf_counter()
+            for instance, data in zip(
+                instances, serializer_class(instances, many=True).data,
+            ):
+                cud_objects.append({'id': instance.pk, 'data': data})
+            serialization_time += time.perf_counter() - started_at
+
+            while len(cud_objects) >= max_batch_objects:
+                emit_batch(cud_objects[:max_batch_objects])
+                cud_objects = cud_objects[max_batch_objects:]
+                serialization_time = 0
+
+        if cud_objects:
+            emit_batch(cud_objects)
+
+    @classmethod
+    @contextlib.contextmanager
+    def bulk_deleting(
+        cls,
+        model_class: typing.Type[Model],
+        pks: typing.Iterable,
+    ):
+        """Context manager that disables the CUD event sent for each
+        instance of model_class with one of the given pks deleted, which
+        are sent in batch instead. Other instances deleted meanwhile
+        (by a cascade) still send their own event"""
+        if not hasattr(cls.local_state, 'bulk_deleting'):
+            cls.local_state.bulk_deleting = set()
+
+        keys = {(model_class, pk) for pk in pks}
+        cls.local_state.bulk_deleting |= keys
+        try:
+            yield
+        finally:
+            cls.local_state.bulk_deleting -= keys
+
+    @classmethod
+    def is_bulk_deleting(
+        cls,
+        model_class: typing.Type[Model],
+        pk: typing.Any,
+    ) -> bool:
+        return (model_class, pk) in getattr(
+            cls.local_state, 'bulk_deleting', (),
+        )
+
+    @classmethod
+    def emit_abroad(
+        cls,
+        event_type: str,
+        payload: typing.Dict,
+        serialization_time: float = 0,
+    ):
+        """Sends the event to the services that are subscribed to the
+        given event_type. The serialization_time (the seconds spent
+        building the payload) is only used by the EventProfiler"""
         if settings.DISABLE_EMIT_IN_EVENTS_LIBRARY:
             return   # No op
 
         if event_type not in cls.map_event_to_target_services:
             return  # No op
 
-        api = EventApi()
+        priority = cls.map_event_to_priority.get(
+            event_type, EventPriority.DEFAULT,
+        )
+        lane = EventLanes.get(priority)
+        event_id = str(uuid4())
+
         for target_service in cls.map_event_to_target_services[event_type]:
-            api.send_event_request(target_service, event_type, payload)
+            sample = EventProfiler.sample(serialization_time)
+            lane.submit(target_service, event_type, payload, event_id, sample)
 
     @classmethod
     def declare_event(
         cls,
         event_type: str,
-        target_services: typing.List[str]
+        target_services: typing.List[str],
+        priority: str = EventPriority.DEFAULT,
     ):
-        """Registers the services that should receive
-        the events with the given event_type"""
+        """Registers the services that should receive the events
+        with the given event_type, and the lane used for sending them"""
         current_targets = cls.map_event_to_target_services.get(event_type, [])
 
         for service_name in target_services:
@@ -142,6 +317,7 @@ class EventBus():
                 current_targets.append(service_name)
 
         cls.map_event_to_target_services[event_type] = current_targets
+        cls.map_event_to_priority[event_type] = priority
 
     @classmethod
     def declare_cud_event(
@@ -149,32 +325,86 @@ class EventBus():
         resource_name: str,
         model_class: typing.Type[Model],
         target_services: typing.List[str],
+        priority: str = EventPriority.DEFAULT,
+        detect_changes: bool = False,
+        exclude_fields: typing.List[str] = None,
     ):
         """Attachs to the model_class post_save and post_delete signals,
-        which emits the appropiate CUD event to the target_services argument"""
+        which emits the appropiate CUD event to the target_services argument.
+        When detect_changes is True, the field values are snapshotted when
+        an instance is loaded, and saves that don't change any of them
+        (ignoring the exclude_fields) don't emit an UPDATED event"""
+        # Imported on first use, as DRF is only needed for CUD events
+        from enumfields.drf import EnumSupportSerializerMixin
+        from rest_framework.serializers import ModelSerializer
+
         class CustomSerializer(EnumSupportSerializerMixin, ModelSerializer):
             """Serializer that extends ModelSerializer to support EnumFields"""
             class Meta:
                 model = model_class
                 fields = '__all__'
 
+        excluded_fields = set(exclude_fields or [])
+        tracked_fields = [
+            field.attname
+            for field in model_class._meta.concrete_fields
+            if field.name not in excluded_fields
+            and field.attname not in excluded_fields
+        ]
+
         def handle_operation(instance, operation: str):
+            started_at = time.perf_counter()
             cud_payload = {
                 'id': instance.id,
                 'cud_operation': operation,
                 'data': CustomSerializer(instance).data,
                 'timestamp': time.time(),
             }
+            serialization_time = time.perf_counter() - started_at
 
-            cls.emit_abroad(resource_name, cud_payload)
+            cls.emit_abroad(resource_name, cud_payload, serialization_time)
 
         def handle_deleted(instance, **kwargs):
+            if cls.is_bulk_deleting(model_class, instance.pk):
+                return  # The event is sent by the CudQuerySet
+
             handle_operation(instance, CudEvent.DELETED)
 
         def handle_edited(instance, created, **kwargs):
+            if detect_changes:
+                previous_digest = instance.__dict__.get(
+                    CHANGES_DIGEST_ATTRIBUTE,
+                )
+                current_digest = get_fields_digest(instance, tracked_fields)
+                instance.__dict__[CHANGES_DIGEST_ATTRIBUTE] = current_digest
+
+                if not created and previous_digest == current_digest:
+                    return  # Nothing changed, no op
+
             cud_operation = CudEvent.CREATED if created else CudEvent.UPDATED
             handle_operation(instance, cud_operation)
 
+        def handle_initialized(instance, **kwargs):
+            instance.__dict__[CHANGES_DIGEST_ATTRIBUTE] = get_fields_digest(
+                instance, tracked_fields,
+            )
+
+        def handle_saving(instance, **kwargs):
+            # An instance that wasn't loaded from the DB (built with
+            # the pk of an existing row) has no reliable snapshot
+            if instance._state.adding:
+                instance.__dict__.pop(CHANGES_DIGEST_ATTRIBUTE, None)
+
         cls.map_event_to_target_services[resource_name] = target_services
+        cls.map_event_to_priority[resource_name] = priority
+        cls.map_model_class_to_cud_resource[model_class] = (
+            resource_name, CustomSerializer,
+        )
         post_save.connect(handle_edited, sender=model_class, weak=False)
         post_delete.connect(handle_deleted, sender=model_class, weak=False)
+
+        if detect_changes:
+            post_init.connect(
+                handle_initialized, sender=model_class, weak=False,
+            )
+            pre_save.connect(handle_saving, sender=model_class, weak=False)
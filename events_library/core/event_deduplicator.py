@@ -0,0 +1,44 @@
+"""EventDeduplicator class, used for discarding redelivered events"""
+import typing
+
+from django.db import IntegrityError, transaction
+
+from .lru_cache import LRUCache
+from ..domain import ReceivedEvent
+
+
+class EventDeduplicator():
+    """Keeps an index of the ids of the received events, so that an
+    event delivered more than once (because of retries in the sender)
+    is only handled once. The index is a ReceivedEvent table, with an
+    LRUCache in front of it that discards most duplicates without
+    any query. Old ReceivedEvent rows are removed by a cron job"""
+
+    # The ids of the events recently handled by this process
+    recent_event_ids = LRUCache(max_size=100000, ttl=60 * 60)
+
+    @classmethod
+    def handle_once(cls, event_id: str, handler: typing.Callable) -> bool:
+        """Calls handler, unless an event with the given event_id was
+        already handled. The ReceivedEvent is created in the same
+        transaction as the handler runs, so if the handler raises an
+        exception the event can be handled again when it's redelivered.
+        Returns whether the handler was called"""
+        event_id = str(event_id)
+        if event_id in cls.recent_event_ids:
+            return False
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    ReceivedEvent.objects.create(event_id=event_id)
+
+            except IntegrityError:
+                # Already handled (or being handled) by another process
+                cls.recent_event_ids.set(event_id, True)
+                return False
+
+            handler()
+
+        cls.recent_event_ids.set(event_id, True)
+        return True
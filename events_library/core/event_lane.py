@@ -0,0 +1,294 @@
+"""EventLane class, used for sending events through independent
+queues, so that bulk traffic never delays latency-sensitive events"""
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+import typing
+import zlib
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .event_profiler import EventSample
+from .payload_store import PayloadStore
+from ..domain import EventLog
+
+logger = logging.getLogger(__name__)
+
+
+class EventPriority():
+    """A class that encapsulates the available priorities (lanes)
+    as members of the class, to be used instead of raw string"""
+    HIGH = 'high'
+    DEFAULT = 'default'
+    BULK = 'bulk'
+
+    @classmethod
+    def is_valid(cls, priority: str):
+        return priority in [
+            EventPriority.HIGH,
+            EventPriority.DEFAULT,
+            EventPriority.BULK,
+        ]
+
+
+# Amount of worker threads of each lane, used when the
+# setting EVENT_LANES_WORKERS doesn't override them.
+# A lane with 0 workers sends its events synchronously,
+# as the events queued in memory are lost if the process
+# is killed, so the default lane only queues them if the
+# setting opts in
+DEFAULT_LANES_WORKERS = {
+    EventPriority.HIGH: 4,
+    EventPriority.DEFAULT: 0,
+    EventPriority.BULK: 1,
+}
+
+# Max amount of events waiting in each queue of a lane, used when
+# the setting EVENT_LANES_QUEUE_SIZE doesn't override it. A full
+# queue blocks the thread that emits the event until there's room,
+# so a bulk operation can't get far ahead of the events sent
+DEFAULT_LANES_QUEUE_SIZE = 1000
+
+
+class EventLane():
+    """A lane of pending events, split in one queue per worker thread,
+    which send the events using the EventApi. The events about the same
+    object (same event_type and payload id) always go to the same queue,
+    so they are sent in the order they were emitted"""
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+
+        self.lock = threading.Lock()
+        self.queues = []
+        self.threads = []
+        self.pid = None
+
+        # The event that the worker of each queue is currently sending
+        self.sending = []
+
+    def get_queue(self, event_type: str, payload: typing.Dict) -> queue.Queue:
+        """Returns the queue for the event, which is the same in
+        every process for the same event_type and payload id"""
+        object_id = None
+        if isinstance(payload, dict):
+            object_id = payload.get('id', None)
+
+        shard_key = f'{event_type}:{object_id}'.encode()
+        return self.queues[zlib.crc32(shard_key) % self.workers]
+
+    def submit(
+        self,
+        service_name: str,
+        event_type: str,
+        payload: typing.Dict,
+        event_id: str = None,
+        sample: EventSample = None,
+    ):
+        """Enqueues the event, to be sent to the service_name
+        by one of the workers of the lane"""
+        # Imported on first use, as it depends on requests and DRF,
+        # which processes that never emit events don't need
+        from .event_api import EventApi
+
+        if self.workers <= 0:
+            EventApi().send_event_request(
+                service_name, event_type, payload, event_id, sample,
+            )
+            return
+
+        self.start()
+
+        # Copied, as the caller might modify the payload before it's sent
+        payload = copy.deepcopy(payload)
+        self.get_queue(event_type, payload).put(
+            (service_name, event_type, payload, event_id, sample),
+        )
+
+    def start(self):
+        """Starts the worker threads, if they aren't running in the
+        current process yet (threads do not survive a fork)"""
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+
+            queue_size = getattr(
+                settings, 'EVENT_LANES_QUEUE_SIZE', DEFAULT_LANES_QUEUE_SIZE,
+            )
+
+            self.pid = os.getpid()
+            self.sending = [None] * self.workers
+            self.queues = [
+                queue.Queue(maxsize=queue_size) for _ in range(self.workers)
+            ]
+            self.threads = [
+                threading.Thread(
+                    target=self.work,
+                    args=(index, events_queue),
+                    name=f'event-lane-{self.name}-{index}',
+                    daemon=True,
+                )
+                for index, events_queue in enumerate(self.queues)
+            ]
+
+            for thread in self.threads:
+                thread.start()
+
+    def work(self, index: int, events_queue: queue.Queue):
+        """Main loop of each worker thread, the only
+        consumer of the given events_queue"""
+        from .event_api import EventApi
+        api = EventApi()
+
+        while True:
+            event = events_queue.get()
+            service_name, event_type, payload, event_id, sample = event
+            self.sending[index] = event
+
+            try:
+                api.send_event_request(
+                    service_name, event_type, payload, event_id, sample,
+                )
+
+            except Exception:
+                logger.exception(
+                    'Unexpected error sending %s to %s',
+                    event_type, service_name,
+                )
+
+            finally:
+                self.sending[index] = None
+
+                # Each thread owns a DB connection, used for the EventLog
+                close_old_connections()
+                events_queue.task_done()
+
+    def join(self, deadline: float = None) -> bool:
+        """Blocks until every enqueued event has been sent, or until
+        the deadline (a time.monotonic value) is reached. Returns
+        whether every event was sent"""
+        if self.pid != os.getpid():
+            return True
+
+        for events_queue in self.queues:
+            with events_queue.all_tasks_done:
+                while events_queue.unfinished_tasks:
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            return False
+
+                    events_queue.all_tasks_done.wait(timeout)
+
+        return True
+
+    def abandon(self) -> int:
+        """Removes the events that are still waiting in the queues, and
+        stores them (and the ones being sent) as failed EventLogs, so
+        that the events lost can be found. Returns the amount of them"""
+        if self.pid != os.getpid():
+            return 0
+
+        unsent = []
+        for events_queue in self.queues:
+            while True:
+                try:
+                    unsent.append(events_queue.get_nowait())
+                except queue.Empty:
+                    break
+                events_queue.task_done()
+
+        sending = [event for event in self.sending if event is not None]
+
+        for events, error_message in [
+            (unsent, 'Not sent, the process exited first'),
+            (sending, 'Might not be sent, the process exited while sending'),
+        ]:
+            for service_name, event_type, payload, _, _ in events:
+                try:
+                    EventLog.objects.create(
+                        target_service=service_name,
+                        event_type=event_type,
+                        **PayloadStore.get_log_fields(payload),
+                        was_success=False,
+                        error_message=error_message,
+                    )
+                except Exception:
+                    logger.exception(
+                        'Could not log the unsent %s to %s, with payload %s',
+                        event_type, service_name, payload,
+                    )
+
+        return len(unsent) + len(sending)
+
+
+class EventLanes():
+    """Registry of the lanes, which are created lazily"""
+    lanes = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def get(cls, priority: str) -> EventLane:
+        """Returns the lane for the given priority"""
+        lane = cls.lanes.get(priority, None)
+        if lane is not None:
+            return lane
+
+        workers = {
+            **DEFAULT_LANES_WORKERS,
+            **getattr(settings, 'EVENT_LANES_WORKERS', {}),
+        }
+
+        with cls.lock:
+            if priority not in cls.lanes:
+                cls.lanes[priority] = EventLane(priority, workers[priority])
+
+        return cls.lanes[priority]
+
+    @classmethod
+    def join(cls, timeout: float = None) -> bool:
+        """Blocks until every lane has sent its enqueued events, or
+        until the timeout (in seconds) has elapsed. Returns whether
+        every event was sent"""
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        return all([
+            lane.join(deadline) for lane in list(cls.lanes.values())
+        ])
+
+    @classmethod
+    def join_at_exit(cls):
+        """Waits for the enqueued events before the process exits, at
+        most EVENT_LANES_EXIT_TIMEOUT seconds, so that a service that
+        doesn't respond can't block the exit forever. The events not
+        sent by then are stored as failed EventLogs (see abandon).
+        Commands that emit many events should call join themselves,
+        and fail if it returns False, instead of relying on this"""
+        timeout = getattr(settings, 'EVENT_LANES_EXIT_TIMEOUT', 10)
+        if cls.join(timeout):
+            return
+
+        unsent = sum([
+            lane.abandon() for lane in list(cls.lanes.values())
+        ])
+        logger.error(
+            'Exiting with %s events not sent after waiting %s seconds, '
+            'stored as failed EventLogs',
+            unsent, timeout,
+        )
+
+
+# Short-lived processes (management commands, jobs) must not exit
+# while there are events waiting in the lanes. It's registered after
+# the EventProfiler's hook (this module imports it), so it runs first,
+# and the samples of the events sent meanwhile are flushed as well
+atexit.register(EventLanes.join_at_exit)
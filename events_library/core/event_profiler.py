@@ -0,0 +1,194 @@
+"""EventProfiler class, used for measuring the sent events"""
+import atexit
+import logging
+import random
+import threading
+import time
+import typing
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from ..domain import EventProfile, LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+class EventSample():
+    """Measurements of a single sampled event, sent to one service"""
+
+    def __init__(self, sample_rate: float, serialization_time: float = 0):
+        self.sample_rate = sample_rate
+        self.serialization_time = serialization_time
+
+        self.payload_bytes = 0
+        self.compressed_bytes = 0
+        self.latency = 0
+
+
+class ProfileAggregate():
+    """Aggregated measurements, not yet written to the EventProfile"""
+
+    def __init__(self) -> None:
+        self.sampled_count = 0
+        self.estimated_count = 0
+        self.payload_bytes = 0
+        self.compressed_bytes = 0
+        self.serialization_time = 0
+        self.latency_histogram = {}
+
+    def add(self, sample: EventSample):
+        self.sampled_count += 1
+        self.estimated_count += 1 / sample.sample_rate
+        self.payload_bytes += sample.payload_bytes
+        self.compressed_bytes += sample.compressed_bytes
+        self.serialization_time += sample.serialization_time
+
+        latency_ms = sample.latency * 1000
+        bucket = next(
+            str(bucket) for bucket in LATENCY_BUCKETS if latency_ms <= bucket
+        )
+        self.latency_histogram[bucket] = (
+            self.latency_histogram.get(bucket, 0) + 1
+        )
+
+    def merge(self, other: 'ProfileAggregate'):
+        self.sampled_count += other.sampled_count
+        self.estimated_count += other.estimated_count
+        self.payload_bytes += other.payload_bytes
+        self.compressed_bytes += other.compressed_bytes
+        self.serialization_time += other.serialization_time
+
+        for bucket, count in other.latency_histogram.items():
+            self.latency_histogram[bucket] = (
+                self.latency_histogram.get(bucket, 0) + count
+            )
+
+
+class EventProfiler():
+    """Sampling profiler of the events sent with EventBus.emit_abroad,
+    enabled by the EVENT_PROFILER_SAMPLE_RATE setting (a value between
+    0 and 1). The measurements are aggregated in memory, and merged
+    into the EventProfile table every EVENT_PROFILER_FLUSH_INTERVAL
+    seconds, so that the aggregates of every process can be read
+    with the dump_event_profile command or the admin page. The periodic
+    flushes run in a background thread, with its own DB connection, so
+    they are never part of the transaction of the code emitting events"""
+
+    # A mapping, where the key is a tuple with the event_type
+    # and target_service, and the value is a ProfileAggregate
+    aggregates = {}
+    lock = threading.Lock()
+    last_flush_at = time.monotonic()
+    is_flushing = False
+
+    @classmethod
+    def sample(cls, serialization_time: float = 0) -> EventSample:
+        """Returns an EventSample if the event should be
+        measured according to the sample rate, or None"""
+        sample_rate = getattr(settings, 'EVENT_PROFILER_SAMPLE_RATE', 0)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return None
+
+        return EventSample(sample_rate, serialization_time)
+
+    @classmethod
+    def record(
+        cls,
+        event_type: str,
+        target_service: str,
+        sample: EventSample,
+    ):
+        """Adds the sample to the aggregates, which are
+        flushed if the flush interval has elapsed"""
+        key = (event_type, target_service)
+        flush_interval = getattr(
+            settings, 'EVENT_PROFILER_FLUSH_INTERVAL', 60,
+        )
+
+        with cls.lock:
+            if key not in cls.aggregates:
+                cls.aggregates[key] = ProfileAggregate()
+            cls.aggregates[key].add(sample)
+
+            should_flush = not cls.is_flushing and (
+                time.monotonic() - cls.last_flush_at >= flush_interval
+            )
+            if should_flush:
+                cls.is_flushing = True
+
+        if should_flush:
+            try:
+                threading.Thread(
+                    target=cls.flush_in_background,
+                    name='event-profiler-flush',
+                    daemon=True,
+                ).start()
+            except Exception:
+                cls.is_flushing = False
+                raise
+
+    @classmethod
+    def flush_in_background(cls):
+        try:
+            cls.flush()
+        finally:
+            # The connections are per thread, so only this one's are closed
+            connections.close_all()
+            cls.is_flushing = False
+
+    @classmethod
+    def flush(cls):
+        """Merges the aggregates into the EventProfile table. The
+        aggregates that can't be written are kept for the next flush"""
+        with cls.lock:
+            aggregates, cls.aggregates = cls.aggregates, {}
+            cls.last_flush_at = time.monotonic()
+
+        for key, aggregate in aggregates.items():
+            try:
+                cls.write(key, aggregate)
+
+            except Exception:
+                logger.exception('Could not flush the event profile')
+
+                with cls.lock:
+                    if key not in cls.aggregates:
+                        cls.aggregates[key] = ProfileAggregate()
+                    cls.aggregates[key].merge(aggregate)
+
+    @classmethod
+    def write(cls, key: typing.Tuple[str, str], aggregate: ProfileAggregate):
+        """Merges the aggregate into the EventProfile of the key"""
+        event_type, target_service = key
+
+        with transaction.atomic():
+            profile, _ = (
+                EventProfile.objects
+                .select_for_update()
+                .get_or_create(
+                    event_type=event_type,
+                    target_service=target_service,
+                )
+            )
+
+            profile.sampled_count += aggregate.sampled_count
+            profile.estimated_count += aggregate.estimated_count
+            profile.payload_bytes += aggregate.payload_bytes
+            profile.compressed_bytes += aggregate.compressed_bytes
+            profile.serialization_time += aggregate.serialization_time
+
+            for bucket, count in aggregate.latency_histogram.items():
+                profile.latency_histogram[bucket] = (
+                    profile.latency_histogram.get(bucket, 0) + count
+                )
+
+            profile.save()
+
+
+def flush_at_exit():
+    if EventProfiler.aggregates:
+        EventProfiler.flush()
+
+
+atexit.register(flush_at_exit)
@@ -0,0 +1,95 @@
+"""EventQueue class, a durable queue of received events"""
+import logging
+import typing
+import zlib
+from uuid import uuid4
+
+from django.db import transaction
+
+from .payload_store import PayloadStore
+from ..domain import HandlerLog, QueuedEvent
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueue():
+    """Queue of received events, stored in the QueuedEvent table, and
+    split in a fixed amount of partitions. Each partition must be
+    consumed by a single worker, so the events of a resource are
+    never handled concurrently. They are consumed in the order of
+    their ids, but two events received at the same time can commit
+    in the opposite order, and the later one is consumed first. So
+    the events of a resource (CUD events included) might be handled
+    out of order: an older update of an existing replica is skipped,
+    but an older update consumed after a deletion creates it again"""
+
+    # Amount of partitions. The workers of the consume_events
+    # command split them, so it bounds the amount of workers
+    partitions = 256
+
+    @classmethod
+    def get_partition(cls, partition_key: typing.Any) -> int:
+        """Returns the partition for the given key, which is
+        the same in every process (unlike the builtin hash)"""
+        return zlib.crc32(str(partition_key).encode()) % cls.partitions
+
+    @classmethod
+    def enqueue(
+        cls,
+        event_type: str,
+        payload: typing.Dict,
+        partition_key: typing.Any = None,
+    ):
+        """Stores the event in the queue. Events with the same
+        partition_key are handled in the order they are enqueued,
+        while events without a partition_key are spread randomly"""
+        if partition_key is None:
+            partition_key = uuid4()
+
+        QueuedEvent.objects.create(
+            partition=cls.get_partition(partition_key),
+            event_type=event_type,
+            payload=payload,
+        )
+
+    @classmethod
+    def consume(
+        cls,
+        partitions: typing.List[int],
+        handler: typing.Callable[[str, typing.Dict], None],
+        batch_size: int = 100,
+    ) -> int:
+        """Calls the handler, with the event_type and payload as
+        arguments, for the oldest events in the given partitions,
+        and removes them from the queue. An exception raised by the
+        handler is stored in a HandlerLog, and doesn't stop the
+        consumption. Returns the amount of events consumed"""
+        with transaction.atomic():
+            queued_events = list(
+                QueuedEvent.objects
+                .select_for_update()
+                .filter(partition__in=partitions)
+                .order_by('id')[:batch_size]
+            )
+
+            for queued_event in queued_events:
+                try:
+                    with transaction.atomic():
+                        handler(queued_event.event_type, queued_event.payload)
+
+                except Exception as error:
+                    logger.exception(
+                        'Error handling queued %s', queued_event.event_type,
+                    )
+                    HandlerLog.objects.create(
+                        event_type=queued_event.event_type,
+                        **PayloadStore.get_log_fields(queued_event.payload),
+                        error_message=str(error),
+                        handler_name=handler.__name__,
+                    )
+
+            QueuedEvent.objects.filter(
+                pk__in=[queued_event.pk for queued_event in queued_events],
+            ).delete()
+
+        return len(queued_events)
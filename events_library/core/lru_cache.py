@@ -0,0 +1,68 @@
+"""LRUCache class, a bounded in-memory cache for the current process"""
+import collections
+import threading
+import time
+import typing
+
+
+class LRUCache():
+    """Thread safe mapping with a max amount of entries, which
+    discards the least recently used ones when it's full, and
+    (optionally) the entries that are older than ttl seconds"""
+
+    def __init__(self, max_size: int, ttl: float = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.lock = threading.Lock()
+        # A mapping, where the key is the cached key, and
+        # the value is a tuple with the expiration and value
+        self.entries = collections.OrderedDict()
+
+    def get(self, key: typing.Hashable, default: typing.Any = None):
+        """Returns the value of the key, or default if it's
+        not in the cache or its entry has expired"""
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self.entries[key]
+                return default
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: typing.Hashable, value: typing.Any):
+        """Stores the value of the key, discarding the
+        least recently used entry if the cache is full"""
+        expires_at = None
+        if self.ttl is not None:
+            expires_at = time.monotonic() + self.ttl
+
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def pop(self, key: typing.Hashable, default: typing.Any = None):
+        """Removes the key from the cache, returning its value"""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        missing = object()
+        return self.get(key, missing) is not missing
+
+    def __len__(self) -> int:
+        return len(self.entries)
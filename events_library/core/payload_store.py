@@ -0,0 +1,81 @@
+"""PayloadStore class, used for storing the payloads of the logs"""
+import hashlib
+import json
+import typing
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .lru_cache import LRUCache
+from ..domain import EventPayload
+
+
+class PayloadStore():
+    """Decides how the payload of an EventLog or HandlerLog is stored,
+    according to the LOG_PAYLOAD_STORAGE setting:
+
+    - 'inline' (default): in the payload field of the log
+    - 'compact': in an EventPayload, identified by the hash of the
+      payload, so it's stored once no matter how many logs reference
+      it. Payloads bigger than LOG_PAYLOAD_COMPRESS_THRESHOLD bytes
+      are compressed, and the ones bigger than LOG_PAYLOAD_MAX_SIZE
+      bytes are truncated to that size
+    """
+
+    # The hashes of the payloads recently stored (or touched) by this
+    # process, which expire well before the cron job could consider
+    # them unused, so they can be referenced without any query
+    stored_hashes = LRUCache(max_size=10000, ttl=60 * 60)
+
+    @classmethod
+    def get_log_fields(cls, payload: typing.Any) -> typing.Dict:
+        """Returns the fields for creating a log with the given payload"""
+        if getattr(settings, 'LOG_PAYLOAD_STORAGE', 'inline') != 'compact':
+            return {'payload': payload}
+
+        return {'payload': {}, 'payload_ref_id': cls.store(payload)}
+
+    @classmethod
+    def store(cls, payload: typing.Any) -> str:
+        """Creates the EventPayload for the given payload (unless it
+        already exists), and returns its hash"""
+        encoded = json.dumps(
+            payload, sort_keys=True, cls=DjangoJSONEncoder,
+        ).encode()
+        payload_hash = hashlib.sha256(encoded).hexdigest()
+
+        if payload_hash in cls.stored_hashes:
+            return payload_hash
+
+        compress_threshold = getattr(
+            settings, 'LOG_PAYLOAD_COMPRESS_THRESHOLD', 1024,
+        )
+        max_size = getattr(settings, 'LOG_PAYLOAD_MAX_SIZE', 1024 * 1024)
+
+        fields = {'size': len(encoded)}
+        if len(encoded) > max_size:
+            fields['compressed_payload'] = zlib.compress(encoded[:max_size])
+            fields['is_truncated'] = True
+        elif len(encoded) > compress_threshold:
+            fields['compressed_payload'] = zlib.compress(encoded)
+        else:
+            fields['payload'] = payload
+
+        # Touching the existing payload keeps the cron job from deleting
+        # it (as an orphan) before the log that references it is created
+        touched = EventPayload.objects.filter(hash=payload_hash).update(
+            last_used_at=timezone.now(),
+        )
+        if not touched:
+            EventPayload.objects.get_or_create(
+                hash=payload_hash, defaults=fields,
+            )
+
+        # Cached once committed, as a rolled back EventPayload can't be used
+        transaction.on_commit(
+            lambda: cls.stored_hashes.set(payload_hash, True),
+        )
+        return payload_hash
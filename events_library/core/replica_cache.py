@@ -0,0 +1,124 @@
+"""ReplicaCache class, a read-through cache for ObjectModel replicas"""
+import copy
+import typing
+
+from django.core.cache import caches
+from django.db import transaction
+
+from .lru_cache import LRUCache
+from ..domain import ObjectModel
+
+
+class ReplicaCache():
+    """Read-through cache for the instances of an ObjectModel class,
+    with two levels: an LRUCache in the current process, and an
+    optional shared Django cache (Redis, memcached). Both levels
+    are refreshed by EventBus.emit_cud_locally when a CUD event is
+    applied, so the local_ttl only bounds how long other processes
+    might keep returning an outdated instance. The instances read
+    from the DB are added to the shared cache only if it doesn't
+    have them yet, so they never replace a refreshed instance"""
+
+    def __init__(
+        self,
+        object_model_class: typing.Type[ObjectModel],
+        max_size: int = 10000,
+        local_ttl: float = 5,
+        shared_cache_alias: str = None,
+        shared_ttl: float = 300,
+    ) -> None:
+        self.object_model_class = object_model_class
+        self.local_cache = LRUCache(max_size, local_ttl)
+
+        self.shared_cache = None
+        self.shared_ttl = shared_ttl
+        if shared_cache_alias is not None:
+            self.shared_cache = caches[shared_cache_alias]
+
+        self.key_prefix = (
+            f'events_library:replica:{object_model_class._meta.db_table}:'
+        )
+
+    def get_shared_key(self, pk: str) -> str:
+        return f'{self.key_prefix}{pk}'
+
+    def get(self, pk: str) -> typing.Optional[ObjectModel]:
+        """Returns the instance with the given pk,
+        or None if it doesn't exist in the DB"""
+        return self.get_many([pk]).get(str(pk), None)
+
+    def get_many(
+        self,
+        pks: typing.Iterable[str],
+    ) -> typing.Dict[str, ObjectModel]:
+        """Returns a mapping, where the key is the pk and the value is
+        the instance, for the given pks that exist. The instances that
+        are missing in both cache levels are read with a single query.
+        The instances are copies, so the cached ones can't be modified"""
+        instances = {}
+        missing_pks = []
+
+        for pk in {str(pk) for pk in pks}:
+            instance = self.local_cache.get(pk)
+            if instance is None:
+                missing_pks.append(pk)
+            else:
+                instances[pk] = instance
+
+        if missing_pks and self.shared_cache is not None:
+            shared_instances = self.shared_cache.get_many([
+                self.get_shared_key(pk) for pk in missing_pks
+            ])
+            for pk in missing_pks:
+                instance = shared_instances.get(self.get_shared_key(pk))
+                if instance is not None:
+                    instances[pk] = instance
+                    self.local_cache.set(pk, instance)
+
+            missing_pks = [pk for pk in missing_pks if pk not in instances]
+
+        if missing_pks:
+            for instance in self.object_model_class.objects.filter(
+                pk__in=missing_pks,
+            ):
+                instances[instance.pk] = instance
+                self.set(instance, replace=False)
+
+        return {
+            pk: copy.deepcopy(instance) for pk, instance in instances.items()
+        }
+
+    def set(self, instance: ObjectModel, replace: bool = True):
+        """Stores the instance in both cache levels. When replace is
+        False, an instance already in the shared cache is kept, as it
+        might have been refreshed after the given one was read"""
+        self.local_cache.set(instance.pk, instance)
+
+        if self.shared_cache is None:
+            return
+
+        shared_key = self.get_shared_key(instance.pk)
+        if replace:
+            self.shared_cache.set(shared_key, instance, self.shared_ttl)
+        else:
+            self.shared_cache.add(shared_key, instance, self.shared_ttl)
+
+    def invalidate(self, pk: str):
+        """Removes the instance with the given pk from both cache levels"""
+        self.local_cache.pop(str(pk))
+
+        if self.shared_cache is not None:
+            self.shared_cache.delete(self.get_shared_key(pk))
+
+    def refresh(self, instance: ObjectModel):
+        """Invalidates the cached instance, and stores the given
+        one once the current transaction (if any) is committed"""
+        self.invalidate(instance.pk)
+        transaction.on_commit(lambda: self.set(instance))
+
+    def discard(self, pk: str):
+        """Invalidates the cached instance, now and once the current
+        transaction (if any) is committed, as it might be cached again
+        by a concurrent read before the deletion is committed"""
+        self.invalidate(pk)
+        transaction.on_commit(lambda: self.invalidate(pk))
@@ -1 +1,5 @@
-from .models import EventLog, HandlerLog, ObjectModel
+from .models import (  # noqa: F401
+    EventLog, EventPayload, EventProfile, HandlerLog,
+    ObjectModel, QueuedEvent, ReceivedEvent,
+    LATENCY_BUCKETS,
+)
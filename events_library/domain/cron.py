@@ -4,7 +4,7 @@
 from django.utils import timezone
 from django_cron import CronJobBase, Schedule
 
-from .models import EventLog, HandlerLog
+from .models import EventLog, EventPayload, HandlerLog, ReceivedEvent
 
 
 class SuccessfulEventLogsRecycling(CronJobBase):
@@ -37,3 +37,36 @@ class ErrorLogsCleanUp(CronJobBase):
 
         EventLog.objects.filter(created_at__lte=thirty_days_ago).delete()
         HandlerLog.objects.filter(created_at__lte=thirty_days_ago).delete()
+
+
+class ReceivedEventsCleanUp(CronJobBase):
+    """Cron job that deletes ReceivedEvent that were created more
+    than a day ago, as no event is redelivered after that long"""
+
+    schedule = Schedule(run_every_mins=60)
+    code = f"{__name__}.ReceivedEventsCleanUp"
+
+    def do(self):
+        """Run task by cron."""
+        one_day_ago = timezone.now() - timezone.timedelta(days=1)
+
+        ReceivedEvent.objects.filter(created_at__lte=one_day_ago).delete()
+
+
+class OrphanEventPayloadsCleanUp(CronJobBase):
+    """Cron job that deletes EventPayload that are no longer
+    referenced by any EventLog or HandlerLog. Recently used ones
+    are kept, as a log might be about to reference them"""
+
+    schedule = Schedule(run_every_mins=60 * 24)
+    code = f"{__name__}.OrphanEventPayloadsCleanUp"
+
+    def do(self):
+        """Run task by cron."""
+        one_day_ago = timezone.now() - timezone.timedelta(days=1)
+
+        EventPayload.objects.filter(
+            last_used_at__lte=one_day_ago,
+            event_logs__isnull=True,
+            handler_logs__isnull=True,
+        ).delete()
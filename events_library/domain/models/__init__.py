@@ -1,3 +1,7 @@
 from .base import ObjectModel  # noqa: F401
+from .event_payload import EventPayload  # noqa: F401
 from .event_log import EventLog  # noqa: F401
 from .handler_log import HandlerLog  # noqa: F401
+from .received_event import ReceivedEvent  # noqa: F401
+from .queued_event import QueuedEvent  # noqa: F401
+from .event_profile import EventProfile, LATENCY_BUCKETS  # noqa: F401
@@ -1,3 +1,5 @@
+import typing
+
 from django.contrib.postgres.fields import JSONField
 from django.db import models
 from uuid import uuid4
@@ -15,6 +17,17 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class PayloadLogMixin():
+    """Mixin for the models that log the payload of an event, either
+    in their payload field, or in an EventPayload (payload_ref field)"""
+
+    @property
+    def stored_payload(self):
+        if self.payload_ref_id is None:
+            return self.payload
+        return self.payload_ref.get_payload()
+
+
 class ObjectModel(models.Model):
     """Model class to be used for synchronization
     and replication of other's services models"""
@@ -23,5 +36,31 @@ class ObjectModel(models.Model):
     data = JSONField()
     timestamp = models.FloatField()
 
+    # An events_library.core.ReplicaCache, set by
+    # subscribe_to_cud when it's called with use_cache
+    replica_cache = None
+
     class Meta:
         abstract = True
+
+    @classmethod
+    def get_cached(cls, pk: str) -> typing.Optional['ObjectModel']:
+        """Returns the instance with the given pk (or None if it doesn't
+        exist), reading it from the replica_cache when there's one"""
+        if cls.replica_cache is None:
+            return cls.objects.filter(pk=pk).first()
+
+        return cls.replica_cache.get(pk)
+
+    @classmethod
+    def get_many_cached(
+        cls,
+        pks: typing.Iterable[str],
+    ) -> typing.Dict[str, 'ObjectModel']:
+        """Returns a mapping, where the key is the pk and the value
+        is the instance, for the given pks that exist, reading
+        them from the replica_cache when there's one"""
+        if cls.replica_cache is None:
+            return cls.objects.in_bulk([str(pk) for pk in pks])
+
+        return cls.replica_cache.get_many(pks)
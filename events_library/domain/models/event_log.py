@@ -2,18 +2,29 @@ from django.contrib.postgres.fields import JSONField
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-from .base import BaseModel
+from .base import BaseModel, PayloadLogMixin
+from .event_payload import EventPayload
 
 
-class EventLog(BaseModel):
+class EventLog(PayloadLogMixin, BaseModel):
     target_service = models.CharField(max_length=20, editable=False)
     event_type = models.CharField(max_length=60, blank=False)
     payload = JSONField(default=dict, encoder=DjangoJSONEncoder)
+    payload_ref = models.ForeignKey(
+        EventPayload, null=True, editable=False,
+        on_delete=models.SET_NULL, related_name='event_logs',
+    )
 
     retry_number = models.IntegerField(default=0)
     was_success = models.BooleanField(default=False)
     error_message = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['event_type', 'created_at']),
+        ]
+
     def __str__(self) -> str:
         status = 'Success' if self.was_success else 'Failure'
         return f'{self.event_type} to {self.target_service} ({status})'
@@ -0,0 +1,40 @@
+import json
+import zlib
+
+from django.contrib.postgres.fields import JSONField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class EventPayload(models.Model):
+    """Payload of the logged events, stored once and identified by the
+    hash of its content, so that the EventLog of every retry and target
+    (and the HandlerLog of every handler) reference the same row. Big
+    payloads are stored compressed, and the biggest ones truncated"""
+    hash = models.CharField(max_length=64, primary_key=True, editable=False)
+    size = models.IntegerField(editable=False)
+
+    payload = JSONField(null=True, encoder=DjangoJSONEncoder)
+    compressed_payload = models.BinaryField(null=True)
+    is_truncated = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Updated whenever a log starts referencing the payload, so that
+    # it isn't deleted as an orphan while that log is being created
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return self.hash
+
+    def get_payload(self):
+        """Returns the payload, decompressing it if needed. A truncated
+        payload is returned as a dict with the beginning of its JSON"""
+        if self.compressed_payload is None:
+            return self.payload
+
+        encoded = zlib.decompress(bytes(self.compressed_payload)).decode()
+        if self.is_truncated:
+            return {'truncated': True, 'size': self.size, 'json': encoded}
+
+        return json.loads(encoded)
@@ -0,0 +1,78 @@
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+
+# Upper bounds (in milliseconds) of the buckets of the latency histograms
+LATENCY_BUCKETS = [
+    1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1000, 2000, 5000, 10000, 30000, float('inf'),
+]
+
+
+class EventProfile(models.Model):
+    """Rolling aggregates of the sampled events sent with each
+    event_type to each target_service, which are written by the
+    EventProfiler. Sizes and times are totals, so they can be
+    merged from every process, and the latencies are stored in
+    a histogram (see LATENCY_BUCKETS) for the same reason"""
+    event_type = models.CharField(max_length=60, editable=False)
+    target_service = models.CharField(max_length=20, editable=False)
+
+    sampled_count = models.BigIntegerField(default=0)
+    estimated_count = models.FloatField(default=0)
+
+    payload_bytes = models.BigIntegerField(default=0)
+    compressed_bytes = models.BigIntegerField(default=0)
+    serialization_time = models.FloatField(default=0)
+    latency_histogram = JSONField(default=dict)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('event_type', 'target_service')]
+
+    def __str__(self) -> str:
+        return f'{self.event_type} to {self.target_service}'
+
+    def get_average(self, total: float) -> float:
+        if not self.sampled_count:
+            return 0
+        return total / self.sampled_count
+
+    @property
+    def average_payload_bytes(self) -> float:
+        return self.get_average(self.payload_bytes)
+
+    @property
+    def average_compressed_bytes(self) -> float:
+        return self.get_average(self.compressed_bytes)
+
+    @property
+    def average_serialization_ms(self) -> float:
+        return self.get_average(self.serialization_time) * 1000
+
+    @property
+    def estimated_total_bytes(self) -> float:
+        return self.average_payload_bytes * self.estimated_count
+
+    def get_latency_percentile(self, percentile: float) -> float:
+        """Returns the upper bound (in milliseconds) of the
+        histogram bucket that contains the given percentile"""
+        total = sum(self.latency_histogram.values())
+        if not total:
+            return 0
+
+        accumulated = 0
+        for bucket in LATENCY_BUCKETS:
+            accumulated += self.latency_histogram.get(str(bucket), 0)
+            if accumulated >= total * percentile / 100:
+                return bucket
+
+        return LATENCY_BUCKETS[-1]
+
+    @property
+    def p50_latency_ms(self) -> float:
+        return self.get_latency_percentile(50)
+
+    @property
+    def p99_latency_ms(self) -> float:
+        return self.get_latency_percentile(99)
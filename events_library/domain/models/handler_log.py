@@ -2,15 +2,26 @@ from django.contrib.postgres.fields import JSONField
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-from .base import BaseModel
+from .base import BaseModel, PayloadLogMixin
+from .event_payload import EventPayload
 
 
-class HandlerLog(BaseModel):
+class HandlerLog(PayloadLogMixin, BaseModel):
     handler_name = models.CharField(max_length=60, blank=False)
     error_message = models.TextField(blank=False)
 
     event_type = models.CharField(max_length=60, blank=False)
     payload = JSONField(default=dict, encoder=DjangoJSONEncoder)
+    payload_ref = models.ForeignKey(
+        EventPayload, null=True, editable=False,
+        on_delete=models.SET_NULL, related_name='handler_logs',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['event_type', 'created_at']),
+        ]
 
     def __str__(self):
         return self.event_type
@@ -0,0 +1,24 @@
+from django.contrib.postgres.fields import JSONField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class QueuedEvent(models.Model):
+    """Received event waiting to be handled by the consume_events
+    command. The partition is derived from the id of the resource
+    the event is about, so events of the same object are always
+    handled by the same worker, one at a time. They are handled in
+    the order of their ids, which isn't always the order in which
+    they were committed, so they might be handled out of order"""
+    id = models.BigAutoField(primary_key=True)
+    partition = models.PositiveSmallIntegerField()
+
+    event_type = models.CharField(max_length=60, blank=False)
+    payload = JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        index_together = [('partition', 'id')]
+
+    def __str__(self) -> str:
+        return self.event_type
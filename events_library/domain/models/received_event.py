@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class ReceivedEvent(models.Model):
+    """Compact record of the ids of the received events, used
+    for discarding the events that are delivered more than once"""
+    event_id = models.UUIDField(primary_key=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return str(self.event_id)
@@ -0,0 +1,38 @@
+"""Helpers for exporting names from a package lazily"""
+import importlib
+import typing
+
+
+def make_lazy_getattr(
+    package_globals: typing.Dict[str, typing.Any],
+    exports: typing.Dict[str, str],
+) -> typing.Callable[[str], typing.Any]:
+    """Returns a module level __getattr__ function (PEP 562) for a
+    package (or module), which imports the module that defines an exported name
+    the first time that name is accessed, so that importing the
+    package doesn't load the heavy dependencies of its modules
+
+    Arguments:
+        package_globals: dict
+            The globals() of the package, where each loaded
+            name is stored, so it is only resolved once
+
+        exports: dict
+            A mapping, where the key is an exported name, and the
+            value is the module (relative to the package) defining it
+    """
+    module_name = package_globals['__name__']
+    package_name = package_globals['__package__']
+
+    def __getattr__(name: str) -> typing.Any:
+        if name not in exports:
+            raise AttributeError(
+                f'module {module_name!r} has no attribute {name!r}'
+            )
+
+        module = importlib.import_module(exports[name], package_name)
+        value = getattr(module, name)
+        package_globals[name] = value
+        return value
+
+    return __getattr__
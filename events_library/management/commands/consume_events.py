@@ -0,0 +1,114 @@
+"""Command that handles the events queued by the EventViewSet"""
+import multiprocessing
+import signal
+import typing
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from ...application import emit_received_event
+from ...core import EventLanes, EventProfiler, EventQueue
+
+
+def consume_partitions(
+    partitions: typing.List[int],
+    stopping: multiprocessing.Event,
+    batch_size: int,
+    poll_interval: float,
+):
+    """Main loop of each worker process, which consumes the
+    events of its partitions until the stopping event is set"""
+    # The parent process handles the signals, and sets stopping
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    while not stopping.is_set():
+        close_old_connections()
+        consumed = EventQueue.consume(
+            partitions, emit_received_event, batch_size,
+        )
+
+        if consumed < batch_size:
+            stopping.wait(poll_interval)
+
+    # Worker processes exit without running the atexit hooks, so the
+    # events emitted by the handlers must be sent (and their samples
+    # written) explicitly
+    EventLanes.join_at_exit()
+    EventProfiler.flush()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Handles the events queued by the EventViewSet (when the '
+        'QUEUE_RECEIVED_EVENTS setting is True) in a pool of worker '
+        'processes. The events of each resource are always handled '
+        'by the same worker, one at a time, so there must be a single '
+        'instance of this command running. Events received at the '
+        'same time might be handled out of order, by the event '
+        'handlers and by the replicas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=multiprocessing.cpu_count(),
+            help='Amount of worker processes (default: amount of CPUs)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Max amount of events handled in each transaction',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1,
+            help='Seconds to wait when there are no queued events',
+        )
+
+    def handle(self, *args, **options):
+        workers = min(options['workers'], EventQueue.partitions)
+
+        # Forked processes must not share the DB connections
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        stopping = context.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping, waiting for the workers...')
+            stopping.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        def start_worker(index: int) -> multiprocessing.Process:
+            process = context.Process(
+                target=consume_partitions,
+                name=f'consume-events-{index}',
+                args=(
+                    list(range(index, EventQueue.partitions, workers)),
+                    stopping,
+                    options['batch_size'],
+                    options['poll_interval'],
+                ),
+            )
+            process.start()
+            return process
+
+        processes = [start_worker(index) for index in range(workers)]
+        self.stdout.write(f'Consuming events with {workers} workers')
+
+        while not stopping.is_set():
+            for index, process in enumerate(processes):
+                if not process.is_alive() and not stopping.is_set():
+                    self.stderr.write(
+                        f'{process.name} exited with code '
+                        f'{process.exitcode}, restarting it'
+                    )
+                    processes[index] = start_worker(index)
+
+            stopping.wait(1)
+
+        for process in processes:
+            process.join()
+
+        self.stdout.write('Stopped')
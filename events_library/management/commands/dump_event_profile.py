@@ -0,0 +1,64 @@
+"""Command that prints the aggregates written by the EventProfiler"""
+from django.core.management.base import BaseCommand
+
+from ...core import EventProfiler
+from ...domain import EventProfile
+
+ORDERINGS = {
+    'count': lambda profile: profile.estimated_count,
+    'bytes': lambda profile: profile.estimated_total_bytes,
+    'size': lambda profile: profile.average_payload_bytes,
+    'latency': lambda profile: profile.p99_latency_ms,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints, for each event_type and target service, the aggregates '
+        'of the events sampled by the EventProfiler (enabled with the '
+        'EVENT_PROFILER_SAMPLE_RATE setting), so the biggest sources of '
+        'traffic can be found'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--order-by', choices=sorted(ORDERINGS), default='bytes',
+            help='Sorts the rows, descending (default: bytes)',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Deletes the aggregates after printing them',
+        )
+
+    def handle(self, *args, **options):
+        # Includes the samples of this process that weren't written yet
+        EventProfiler.flush()
+
+        profiles = sorted(
+            EventProfile.objects.all(),
+            key=ORDERINGS[options['order_by']],
+            reverse=True,
+        )
+
+        row_format = (
+            '{:<40} {:<14} {:>12} {:>12} {:>12} {:>10} {:>9} {:>9}'
+        )
+        self.stdout.write(row_format.format(
+            'event_type', 'target', 'est. count', 'avg bytes',
+            'avg zlib', 'ser. ms', 'p50 ms', 'p99 ms',
+        ))
+
+        for profile in profiles:
+            self.stdout.write(row_format.format(
+                profile.event_type[:40],
+                profile.target_service,
+                f'{profile.estimated_count:.0f}',
+                f'{profile.average_payload_bytes:.0f}',
+                f'{profile.average_compressed_bytes:.0f}',
+                f'{profile.average_serialization_ms:.2f}',
+                f'{profile.p50_latency_ms:g}',
+                f'{profile.p99_latency_ms:g}',
+            ))
+
+        if options['reset']:
+            EventProfile.objects.all().delete()
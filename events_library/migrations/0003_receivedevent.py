@@ -0,0 +1,20 @@
+# Generated by Django 2.2.17 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_library', '0002_auto_20210301_1652'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceivedEvent',
+            fields=[
+                ('event_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.17 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_library', '0003_receivedevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('partition', models.PositiveSmallIntegerField()),
+                ('event_type', models.CharField(max_length=60)),
+                ('payload', django.contrib.postgres.fields.jsonb.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'index_together': {('partition', 'id')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.17 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_library', '0004_queuedevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(editable=False, max_length=60)),
+                ('target_service', models.CharField(editable=False, max_length=20)),
+                ('sampled_count', models.BigIntegerField(default=0)),
+                ('estimated_count', models.FloatField(default=0)),
+                ('payload_bytes', models.BigIntegerField(default=0)),
+                ('compressed_bytes', models.BigIntegerField(default=0)),
+                ('serialization_time', models.FloatField(default=0)),
+                ('latency_histogram', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('event_type', 'target_service')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.17 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields.jsonb
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events_library', '0005_eventprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventPayload',
+            fields=[
+                ('hash', models.CharField(editable=False, max_length=64, primary_key=True, serialize=False)),
+                ('size', models.IntegerField(editable=False)),
+                ('payload', django.contrib.postgres.fields.jsonb.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('compressed_payload', models.BinaryField(null=True)),
+                ('is_truncated', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='eventlog',
+            name='payload_ref',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='event_logs', to='events_library.EventPayload'),
+        ),
+        migrations.AddField(
+            model_name='handlerlog',
+            name='payload_ref',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='handler_logs', to='events_library.EventPayload'),
+        ),
+    ]
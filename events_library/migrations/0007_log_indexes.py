@@ -0,0 +1,69 @@
+# Generated by Django 2.2.17 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # The log tables can be big, so the indexes are built without
+    # blocking the writes, which can't be done inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('events_library', '0006_eventpayload'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS "events_libr_created_5eb1cc_idx" '
+                'ON "events_library_eventlog" ("created_at");'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "events_libr_created_5eb1cc_idx";',
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='eventlog',
+                    index=models.Index(fields=['created_at'], name='events_libr_created_5eb1cc_idx'),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS "events_libr_event_t_fc9d5e_idx" '
+                'ON "events_library_eventlog" ("event_type", "created_at");'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "events_libr_event_t_fc9d5e_idx";',
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='eventlog',
+                    index=models.Index(fields=['event_type', 'created_at'], name='events_libr_event_t_fc9d5e_idx'),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS "events_libr_created_d99ddd_idx" '
+                'ON "events_library_handlerlog" ("created_at");'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "events_libr_created_d99ddd_idx";',
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='handlerlog',
+                    index=models.Index(fields=['created_at'], name='events_libr_created_d99ddd_idx'),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS "events_libr_event_t_b2a6d7_idx" '
+                'ON "events_library_handlerlog" ("event_type", "created_at");'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "events_libr_event_t_b2a6d7_idx";',
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='handlerlog',
+                    index=models.Index(fields=['event_type', 'created_at'], name='events_libr_event_t_b2a6d7_idx'),
+                ),
+            ],
+        ),
+    ]
@@ -1,11 +1,22 @@
 import typing
 
+from django.conf import settings
 from django.db.models import Model
 from typing import Callable, Union
 
-from .application import CudPayloadSerializer  # noqa: F401
-from .core import EventBus, CudEvent   # noqa: F401
+from .core.cud_queryset import (  # noqa: F401
+    CudManager, CudQuerySet, CudQuerySetMixin,
+)
+from .core.event_bus import EventBus, CudEvent   # noqa: F401
+from .core.event_lane import EventPriority
+from .core.replica_cache import ReplicaCache
 from .domain import ObjectModel
+from .lazy_exports import make_lazy_getattr
+
+# Re-exported lazily, as it depends on DRF
+__getattr__ = make_lazy_getattr(globals(), {
+    'CudPayloadSerializer': '.application.serializers',
+})
 
 
 def emit(event_type: str, payload: typing.Dict):
@@ -49,6 +60,7 @@ def subscribe_to(
 def subscribe_to_cud(
     resource_name: str,
     object_model_class: typing.Type[ObjectModel],
+    use_cache: bool = False,
 ):
     """Subscribes to CUD changes, and reflects them
     in the given object_model_class
@@ -60,6 +72,13 @@ def subscribe_to_cud(
         object_model_class: events_library.models.ObjectModel
             This must be a class that simply inherits from the
             ObjectModel class exported from the events_library
+
+        use_cache: bool
+            Whether to attach a ReplicaCache to the object_model_class,
+            used by its get_cached and get_many_cached methods, and
+            refreshed whenever a CUD event is applied. It's configured
+            with the REPLICA_CACHE setting, a dict with the (optional)
+            keys MAX_SIZE, LOCAL_TTL, SHARED_CACHE_ALIAS and SHARED_TTL
     """
     if not issubclass(object_model_class, ObjectModel):
         raise ValueError(
@@ -67,7 +86,18 @@ def subscribe_to_cud(
             'the ObjectModel exported from the events_library'
         )
 
-    EventBus.subscribe_to_cud(resource_name, object_model_class)
+    replica_cache = None
+    if use_cache:
+        cache_settings = getattr(settings, 'REPLICA_CACHE', {})
+        replica_cache = ReplicaCache(
+            object_model_class,
+            max_size=cache_settings.get('MAX_SIZE', 10000),
+            local_ttl=cache_settings.get('LOCAL_TTL', 5),
+            shared_cache_alias=cache_settings.get('SHARED_CACHE_ALIAS'),
+            shared_ttl=cache_settings.get('SHARED_TTL', 300),
+        )
+
+    EventBus.subscribe_to_cud(resource_name, object_model_class, replica_cache)
 
 
 class Service():
@@ -96,9 +126,15 @@ class Service():
         ]
 
 
+def _validate_priority(priority: str):
+    if not EventPriority.is_valid(priority):
+        raise ValueError(f'{priority} is not a valid priority')
+
+
 def declare_event(
     event_type: str,
     subscribed_services: typing.List[str],
+    priority: str = EventPriority.DEFAULT,
 ):
     """Configures that events of the given event_type
     reach the services provided in the subscribed_services
@@ -114,6 +150,11 @@ def declare_event(
             The names of the services that are subscribed to that
             event_type.
 
+        priority: str
+            The lane used for sending the events ('high', 'default'
+            or 'bulk'). Each lane has its own queue and workers, so
+            events in the 'high' lane never wait behind bulk traffic
+
     NOTE:
     Admisable values for the service names are:
 
@@ -125,7 +166,8 @@ def declare_event(
     - 'selfdecode'
 
     You can use the Service class (exported from the events_library
-    as well) for getting those options and avoid errors
+    as well) for getting those options and avoid errors. The same
+    applies to the EventPriority class and the priority argument
     """
     for service_name in subscribed_services:
         if not Service.is_valid(service_name):
@@ -134,13 +176,18 @@ def declare_event(
                 'as a member of subscribed_services'
             )
 
-    EventBus.declare_event(event_type, subscribed_services)
+    _validate_priority(priority)
+
+    EventBus.declare_event(event_type, subscribed_services, priority)
 
 
 def declare_cud_event(
     resource_name: str,
     model_class: typing.Type[Model],
     subscribed_services: typing.List[str],
+    priority: str = EventPriority.DEFAULT,
+    detect_changes: bool = False,
+    exclude_fields: typing.List[str] = None,
 ):
     """Configures a Django Model to send an event (using the resource_name
     argument as event_type) whenever an instance of that model is created,
@@ -158,6 +205,26 @@ def declare_cud_event(
             The names of the services that are subscribed
             to changes of the provided model_class
 
+        priority: str
+            The lane used for sending the events ('high', 'default'
+            or 'bulk'). Use 'bulk' for models that are massively
+            edited, so they don't delay latency-sensitive events
+
+        detect_changes: bool
+            Whether to skip the UPDATED event when an instance is
+            saved without changes in its fields (which happens a lot
+            with update_or_create and admin saves)
+
+        exclude_fields: List[str]
+            Names of fields (like 'updated_at') whose changes
+            are ignored when detect_changes is True
+
+    NOTE:
+    Bulk operations (QuerySet.update, bulk_create, bulk_update and
+    QuerySet.delete) only emit events if the model_class uses the
+    CudManager (or a QuerySet with the CudQuerySetMixin), which sends
+    a single batched event for each operation
+
     NOTE:
     Admisable values for the service names are:
 
@@ -169,7 +236,8 @@ def declare_cud_event(
     - 'selfdecode'
 
     You can use the Service class (exported from the events_library
-    as well) for getting those options and avoid errors
+    as well) for getting those options and avoid errors. The same
+    applies to the EventPriority class and the priority argument
     """
     for service_name in subscribed_services:
         if not Service.is_valid(service_name):
@@ -178,4 +246,9 @@ def declare_cud_event(
                 'as a member of subscribed_services'
             )
 
-    EventBus.declare_cud_event(resource_name, model_class, subscribed_services)
+    _validate_priority(priority)
+
+    EventBus.declare_cud_event(
+        resource_name, model_class, subscribed_services, priority,
+        detect_changes, exclude_fields,
+    )
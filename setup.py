@@ -10,6 +10,8 @@ setuptools.setup(
     version="1.0.0",
     name="events_library",
     packages=setuptools.find_packages(),
+    # The lazy exports rely on module __getattr__ (PEP 562)
+    python_requires=">=3.7",
     long_description=long_description,
     long_description_content_type="text/markdown",
     license=license,